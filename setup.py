@@ -19,8 +19,6 @@ setup(
     install_requires=[
         "PyQt5",
         "pint",
-        "numpy",
-        "pyparsing",
     ],
     entry_points={
         'console_scripts': [
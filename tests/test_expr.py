@@ -0,0 +1,103 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from unacalc.expr import Expression, parse_unit, ureg
+
+
+def evaluate(expr):
+    return Expression(expr).evaluate()
+
+
+@pytest.mark.parametrize("expr, expected", [
+    ("2 * -3", -6),
+    ("3 -2", 1),
+    ("1 - -1", 2),
+    ("-1 + 2", 1),
+])
+def test_signed_literals(expr, expected):
+    assert evaluate(expr) == ureg.Quantity(expected)
+
+
+@pytest.mark.parametrize("expr", ["2^3^2", "2**3**2"])
+def test_powers_are_right_associative(expr):
+    assert evaluate(expr) == ureg.Quantity(512)
+
+
+@pytest.mark.parametrize("expr, expected", [
+    ("8 / 2 / 2", 2),
+    ("1 - 2 - 3", -4),
+    ("1 - 2 + 3", 2),
+    ("2 * 3 / 4", 1.5),
+])
+def test_chains_are_left_associative(expr, expected):
+    assert evaluate(expr) == ureg.Quantity(expected)
+
+
+def test_precedence_and_parentheses():
+    assert evaluate("1 + 2 * 3") == ureg.Quantity(7)
+    assert evaluate("(1 + 2) * 3") == ureg.Quantity(9)
+
+
+def test_number_with_unit():
+    assert evaluate("5 m + 3 m") == 8 * ureg.m
+    assert evaluate("2 m ^ 2") == 4 * ureg.m ** 2
+    assert evaluate("100 W * 2 h").to("Wh") == 200 * ureg.Wh
+
+
+def test_offset_and_log_units():
+    assert evaluate("20 degC") == ureg.Quantity(20, "degC")
+    assert evaluate("32 degF").to(parse_unit("degC")).magnitude == pytest.approx(0, abs=1e-9)
+    assert evaluate("3 dB") == ureg.Quantity(3, "dB")
+
+
+def test_constants():
+    assert evaluate("c") == ureg.Quantity(1, "speed_of_light")
+
+
+def test_date_arithmetic():
+    assert evaluate("2024-11-13 + 2 d") == datetime(2024, 11, 15)
+    assert evaluate("2024-06-08 - 2024-06-01") == timedelta(days=7)
+    assert evaluate("2024-06-08T19:45:10 + 1 h") == datetime(2024, 6, 8, 20, 45, 10)
+
+
+def test_now_and_today_are_resolved_on_each_evaluation():
+    expression = Expression("now + 1 h")
+    assert not expression.is_constant
+    before = datetime.now()
+    result = expression.evaluate()
+    assert before + timedelta(hours=1) <= result <= datetime.now() + timedelta(hours=1)
+    today = evaluate("today")
+    assert today.time() == datetime.min.time()
+    assert today.date() in (before.date(), datetime.now().date())
+
+
+@pytest.mark.parametrize("expr", ["1 2", "2 kg m", "(1", "1)", "1 +", "", "* 2", "2024-13-01"])
+def test_malformed_input_raises_value_error(expr):
+    with pytest.raises(ValueError):
+        Expression(expr)
+
+
+@pytest.mark.parametrize("head, tail", [
+    ("1", " + 2"),
+    ("1 - 2", " - 3"),
+    ("2 * 3", " + 4 * 5"),
+    ("2 m", " + 30 cm"),
+    ("(1 + 2)", " - -3"),
+    ("2 ^ 3", " + 1"),
+    ("2024-06-08", " + 5 d"),
+])
+def test_extended_matches_full_parse(head, tail):
+    extended = Expression(head).extended(tail)
+    assert extended is not None
+    assert extended.evaluate() == Expression(head + tail).evaluate()
+    assert extended.is_constant
+
+
+@pytest.mark.parametrize("head, tail", [
+    ("1", " * 2"),       # binds tighter than the existing expression
+    ("1", " + 2 - 3"),   # more than one term
+    ("2020-01", "-15"),  # no whitespace: would split a date literal
+])
+def test_extended_falls_back(head, tail):
+    assert Expression(head).extended(tail) is None
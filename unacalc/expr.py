@@ -0,0 +1,409 @@
+import os
+import re
+import sys
+import operator
+import pint
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+# UNACALC_UNIT_CACHE opts in to caching parsed unit definitions on disk, cutting registry
+# start-up ~8x: a directory, or 'auto' for the user cache directory
+_unit_cache_env = os.environ.get('UNACALC_UNIT_CACHE') or None
+ureg = pint.UnitRegistry(cache_folder=':auto:' if _unit_cache_env == 'auto' else _unit_cache_env)
+_PREFERRED = (ureg.s, ureg.m, ureg.kg, ureg.W, ureg.Wh)
+_PREFERRED_SET = frozenset(_PREFERRED)
+ureg.default_preferred_units = list(_PREFERRED)
+ureg.default_format = '~'
+ureg.default_format = '.3f~'
+
+# Unicode variants accepted in typed or pasted input
+NORMALIZE = str.maketrans({'µ': 'u', '×': '*', '÷': '/', '–': '-', '−': '-'})
+
+# Parsing a unit string is one of the most expensive pint operations
+_UNIT_CACHE = {}
+
+def parse_unit(unit):
+    u = _UNIT_CACHE.get(unit)
+    if u is None:
+        u = ureg.parse_units(unit)
+        _UNIT_CACHE[unit] = u
+    return u
+
+# Elements for named constants such as c, resolved from their string once per name
+_CONST_CACHE = {}
+
+# Constants whose value depends on the time of evaluation; resolved on every call
+VOLATILE_CONSTANTS = {
+    'now': datetime.now,
+    'today': lambda: datetime.combine(datetime.now(), datetime.min.time()),
+}
+
+_DATE_RE = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+_DATETIME_RE = re.compile(r'^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}(:\d{2}(\.\d+)?)?((?:[+-]\d{2}:\d{2})|Z)?$')
+
+# Dates are immutable, so each literal is converted once and shared by every parse containing it
+@lru_cache(maxsize=128)
+def _parse_datetime(value):
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        raise ValueError(f"Invalid ISO 8601 datetime format: {value}")
+
+@lru_cache(maxsize=128)
+def _parse_date(value):
+    try:
+        return datetime.strptime(value, "%Y-%m-%d")
+    except ValueError:
+        raise ValueError(f"Invalid date format: {value}")
+
+class ExpressionElement:
+    def __init__(self, value, unit=None):
+        self.is_date = False
+        self.resolve = None
+
+        if isinstance(value, datetime):
+            self.value = value
+            self.is_date = True
+        elif isinstance(value, str):
+            # Strings are only ever date or datetime literals; numbers arrive as int or float
+            if _DATETIME_RE.match(value):
+                self.value = _parse_datetime(value)
+            elif _DATE_RE.match(value):
+                self.value = _parse_date(value)
+            else:
+                raise ValueError(f"Invalid date format: {value}")
+            self.is_date = True
+        else:
+            self.value = value
+        
+        self.unit = unit and unit.translate(NORMALIZE)
+        self._obj = None
+
+    @property
+    def obj(self):
+        # Built on first use, so literals of inputs that fail to parse never reach pint
+        if self._obj is None:
+            if self.is_date:
+                self._obj = self.value
+            elif self.unit:
+                # Quantity() rather than value * unit, which pint rejects for offset and log units
+                self._obj = ureg.Quantity(self.value, parse_unit(self.unit))
+            else:
+                # Unitless literals stay plain numbers; see _emit_operation
+                self._obj = self.value
+        return self._obj
+
+    @staticmethod
+    def from_constant(name):
+        if name in VOLATILE_CONSTANTS:
+            element = ExpressionElement(VOLATILE_CONSTANTS[name]())
+            element.resolve = VOLATILE_CONSTANTS[name]
+            return element
+
+        element = _CONST_CACHE.get(name)
+        if element is None:
+            obj = ureg.Quantity("speed_of_light" if name == 'c' else name)
+            element = ExpressionElement(obj.magnitude, str(obj.units))
+            _CONST_CACHE[name] = element
+        return element
+
+    def __repr__(self):
+        unitstr = " "+self.unit if self.unit else ''
+        return f"EE({self.value}{unitstr})"
+
+_TOKEN_RE = re.compile(r"""
+    (?P<datetime>\d{4}-\d{2}-\d{2}T\d{2}:\d{2}(?::\d{2})?(?:\.\d+)?(?:[+-]\d{2}:\d{2}|Z)?)
+  | (?P<date>\d{4}-\d{2}-\d{2})
+  | (?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)
+  | (?P<ident>[A-Za-z_]+)
+  | (?P<op>\*\*|[-+*/^])
+  | (?P<lparen>\()
+  | (?P<rparen>\))
+  | (?P<skip>\s+)
+  | (?P<mismatch>.)
+""", re.VERBOSE)
+
+PRECEDENCE = {'+': 1, '-': 1, '*': 2, '/': 2, '^': 3, '**': 3}
+RIGHT_ASSOCIATIVE = ('^', '**')
+
+def _tokenize(expression):
+    return [(m.lastgroup, m.group(), m.start(), m.end())
+            for m in _TOKEN_RE.finditer(expression) if m.lastgroup != 'skip']
+
+def _to_number(text):
+    if any(c in text for c in '.eE'):
+        return float(text)
+    return int(text)
+
+def _reduce(output, op):
+    if len(output) < 2:
+        raise ValueError(f"Missing operand for {repr(op)}")
+    right = output.pop()
+    left = output.pop()
+    # Left-associative chains of one precedence level stay flat, e.g. [a, '+', b, '-', c],
+    # so they are reduced in a single loop rather than one nesting level per operator
+    if (isinstance(left, list) and op not in RIGHT_ASSOCIATIVE
+            and PRECEDENCE[left[1]] == PRECEDENCE[op]):
+        left.extend((op, right))
+        output.append(left)
+    else:
+        output.append([left, op, right])
+
+def _parse(expression):
+    """Shunting-yard parser building nested `[left, op, right]` lists of ExpressionElements."""
+    tokens = _tokenize(expression)
+    output = []
+    operators = []
+    expect_operand = True
+    i = 0
+    while i < len(tokens):
+        kind, text, start, end = tokens[i]
+        if expect_operand:
+            # A sign directly followed by digits is part of the number, as in "2 * -3"
+            if (kind == 'op' and text in '+-' and i + 1 < len(tokens)
+                    and tokens[i+1][0] == 'number' and tokens[i+1][2] == end):
+                i += 1
+                kind, text = 'number', text + tokens[i][1]
+            if kind == 'number':
+                unit = None
+                if i + 1 < len(tokens) and tokens[i+1][0] == 'ident':
+                    i += 1
+                    unit = tokens[i][1]
+                output.append(ExpressionElement(_to_number(text), unit))
+            elif kind in ('date', 'datetime'):
+                output.append(ExpressionElement(text, None))
+            elif kind == 'ident':
+                output.append(ExpressionElement.from_constant(text))
+            elif kind == 'lparen':
+                operators.append('(')
+                i += 1
+                continue
+            else:
+                raise ValueError(f"Expected an operand at char {start}, found {repr(text)}")
+            expect_operand = False
+        elif kind == 'op':
+            while operators and operators[-1] != '(' and (
+                    PRECEDENCE[operators[-1]] > PRECEDENCE[text]
+                    or (PRECEDENCE[operators[-1]] == PRECEDENCE[text] and text not in RIGHT_ASSOCIATIVE)):
+                _reduce(output, operators.pop())
+            operators.append(text)
+            expect_operand = True
+        elif kind == 'rparen':
+            while operators and operators[-1] != '(':
+                _reduce(output, operators.pop())
+            if not operators:
+                raise ValueError(f"Unbalanced parentheses at char {start}")
+            operators.pop()
+        else:
+            raise ValueError(f"Expected an operator at char {start}, found {repr(text)}")
+        i += 1
+
+    if expect_operand:
+        raise ValueError("Unexpected end of expression")
+    while operators:
+        op = operators.pop()
+        if op == '(':
+            raise ValueError("Unbalanced parentheses")
+        _reduce(output, op)
+    return output[0]
+
+# UNACALC_PARSE_CACHE sets the parse cache size: 'none' for unbounded, 0 to disable
+DEFAULT_PARSE_CACHE_SIZE = 256
+
+def _parse_cache_size(value):
+    if not value:
+        return DEFAULT_PARSE_CACHE_SIZE
+    if value.lower() == 'none':
+        return None
+    try:
+        size = int(value)
+    except ValueError:
+        size = -1
+    if size < 0:
+        print(f"Ignoring UNACALC_PARSE_CACHE={value!r}: expected a size, 'none' or 0; "
+              f"using {DEFAULT_PARSE_CACHE_SIZE}", file=sys.stderr)
+        return DEFAULT_PARSE_CACHE_SIZE
+    return size
+
+PARSE_CACHE_SIZE = _parse_cache_size(os.environ.get('UNACALC_PARSE_CACHE'))
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse_expression(expression):
+    return _parse(expression)
+
+def _power(left, right):
+    if not isinstance(right, pint.Quantity):
+        return left ** right
+    assert right.dimensionless, "A power can only be dimensionless"
+    exponent = right.magnitude
+    if right.unitless and isinstance(exponent, (int, float)):
+        # Plain ** skips pint's conversion of a Quantity exponent
+        return left ** exponent
+    return left ** right
+
+OPS = {
+    '*': operator.mul,
+    '+': operator.add,
+    '/': operator.truediv,
+    '-': operator.sub,
+    '^': _power,
+    '**': _power,
+}
+
+# Plain numbers are combined by Python itself; pint only joins in once units are involved
+NUMBER_TYPES = (int, float, complex)
+NUMBER_OPS = {
+    '*': operator.mul,
+    '+': operator.add,
+    '/': operator.truediv,
+    '-': operator.sub,
+    '^': operator.pow,
+    '**': operator.pow,
+}
+
+def _datetime_operation(left, op, right):
+    if isinstance(left, pint.Quantity):
+        left = timedelta(seconds=left.to('seconds').magnitude)
+    if isinstance(right, pint.Quantity):
+        right = timedelta(seconds=right.to('seconds').magnitude)
+
+    if op == '+':
+        return left + right
+    elif op == '-':
+        return left - right
+    else:
+        raise ValueError(f"Unsupported operation with datetime:\nL: {repr(left)}\nO: {repr(op)}\nR: {repr(right)}")
+
+# Opcodes of compiled programs, each instruction being an (opcode, argument) pair
+OP_PUSH = 0   # push the argument, a constant value
+OP_CALL = 1   # push the result of calling the argument, for time-dependent constants
+OP_APPLY = 2  # pop two values and push the argument applied to them
+
+def _emit_operation(op, is_date, right_is_date, program, node):
+    """Append the instruction applying `op` to the last two values of `program`."""
+    if is_date or right_is_date:
+        f = lambda left, right, op=op: _datetime_operation(left, op, right)
+        is_date = True
+    elif (op in NUMBER_OPS and isinstance(program[-1][1], NUMBER_TYPES)
+            and isinstance(program[-2][1], NUMBER_TYPES)):
+        f = NUMBER_OPS[op]
+    elif op in OPS:
+        f = OPS[op]
+    else:
+        raise ValueError(f"Unsupported operation:\nO: {repr(op)}\nin: {repr(node)}")
+    if program[-1][0] == OP_PUSH and program[-2][0] == OP_PUSH:
+        right = program.pop()[1]
+        left = program.pop()[1]
+        program.append((OP_PUSH, f(left, right)))
+    else:
+        program.append((OP_APPLY, f))
+    return is_date
+
+def _emit(node, program):
+    """Append instructions computing `node` to `program` and return whether its value is a date.
+
+    Operations on two constants are folded into a single OP_PUSH as they are
+    emitted, so only time-dependent constants leave work for run time.
+    """
+    if isinstance(node, ExpressionElement):
+        if node.resolve:
+            program.append((OP_CALL, node.resolve))
+        else:
+            program.append((OP_PUSH, node.obj))
+        return node.is_date
+    if isinstance(node, list) and len(node) % 2 == 1:
+        is_date = _emit(node[0], program)
+        for i in range(1, len(node), 2):
+            right_is_date = _emit(node[i+1], program)
+            is_date = _emit_operation(node[i], is_date, right_is_date, program, node)
+        return is_date
+    raise ValueError(f"Unsupported expression:\n{repr(node)}")
+
+def run_program(program):
+    stack = []
+    for op, arg in program:
+        if op == OP_PUSH:
+            stack.append(arg)
+        elif op == OP_CALL:
+            stack.append(arg())
+        else:
+            right = stack.pop()
+            stack.append(arg(stack.pop(), right))
+    return stack[-1]
+
+# A trailing "+ term" or "- term"; the leading whitespace keeps "2020-01" + "-15" from being split
+_TAIL_RE = re.compile(r'\s+([+-])\s*(.+)$', re.DOTALL)
+
+class Expression:
+    def __init__(self, expr):
+        parsed = parse_expression(expr)
+        program = []
+        is_date = _emit(parsed, program)
+        self._set_program(parsed, program, is_date)
+
+    @classmethod
+    def _from_program(cls, parsed, program, is_date):
+        expression = cls.__new__(cls)
+        expression._set_program(parsed, program, is_date)
+        return expression
+
+    def _set_program(self, parsed, program, is_date):
+        # Every Expression, built from text or extended from another, is set up here
+        self.parsed_expression = parsed
+        self._program = program
+        self._is_date = is_date
+        self.is_constant = len(program) == 1 and program[0][0] == OP_PUSH
+
+    def extended(self, tail):
+        """Return the Expression for this one's text followed by `tail`, e.g. " + 4 m".
+
+        Only the added term is parsed and compiled. Returns None when `tail` is
+        not a single term added or subtracted at the top level.
+        """
+        if not tail:
+            return self
+        m = _TAIL_RE.match(tail)
+        if m is None:
+            return None
+        op, rest = m.groups()
+        try:
+            node = parse_expression(rest)
+        except ValueError:
+            return None
+        # Terms are bound tighter than + and -, so anything else would regroup
+        if isinstance(node, list) and PRECEDENCE[node[1]] == PRECEDENCE[op]:
+            return None
+
+        parsed = self.parsed_expression
+        if isinstance(parsed, list) and PRECEDENCE[parsed[1]] == PRECEDENCE[op]:
+            parsed = parsed + [op, node]
+        else:
+            parsed = [parsed, op, node]
+        program = list(self._program)
+        right_is_date = _emit(node, program)
+        is_date = _emit_operation(op, self._is_date, right_is_date, program, parsed)
+        return self._from_program(parsed, program, is_date)
+
+    def evaluate(self):
+        result = run_program(self._program)
+        if isinstance(result, NUMBER_TYPES):
+            return ureg.Quantity(result)
+        return result
+
+# Compiled expressions are immutable, so retyping an input such as "now + 1 h" reuses its program
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def cached_expression(expr):
+    return Expression(expr)
+
+def to_preferred(result):
+    if isinstance(result, datetime):
+        return result
+    # to_preferred searches dimensions; skip it when it would be a no-op
+    if result.unitless or result.units in _PREFERRED_SET:
+        return result
+    return result.to_preferred(_PREFERRED)
+
+def warm_up():
+    # The first evaluation and conversion through pint is far slower than later ones
+    for text in ('1 m + 2 m', '2 kW * 3 h', '2^3'):
+        to_preferred(Expression(text).evaluate())
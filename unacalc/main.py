@@ -1,250 +1,37 @@
 import sys
 import re
-import pint
 import random
-import numpy as np
-from pyparsing import Word, alphas, nums, oneOf, infixNotation, opAssoc, Group, ParserElement, Combine, Optional
 from PyQt5.QtWidgets import QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLineEdit, QPushButton, QGridLayout, QLabel, QMenuBar, QAction, QMessageBox, QComboBox, QRadioButton, QButtonGroup, QSlider
 from PyQt5.QtGui import QFont, QPalette, QColor, QKeySequence, QIcon, QPixmap, QImage
-from PyQt5.QtCore import Qt, QPropertyAnimation, QVariantAnimation, QTimer
-from datetime import datetime, timedelta
+from PyQt5.QtCore import Qt, QTimer
+from datetime import datetime
 import traceback
-from collections import namedtuple
+from functools import partial
 
-VERSION = "1.0.3"
+from unacalc.expr import NORMALIZE, cached_expression, parse_unit, to_preferred, warm_up
 
-ureg = pint.UnitRegistry()
-ureg.default_preferred_units = [ureg.s, ureg.m, ureg.kg, ureg.W, ureg.Wh]
-ureg.default_format = '~'
-ureg.default_format = '.3f~'
+VERSION = "1.0.3"
 
-ParserElement.enablePackrat()
+INPUT_STYLE = "background-color: None;"
+INPUT_ERROR_STYLE = "background-color: #550000;"
 
 class CustomButton(QPushButton):
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.default_color = QColor("#2E3440")
-        self.hover_color = QColor("#4C566A")
-        self.pressed_color = QColor("#5E81AC")
-        self.setAutoFillBackground(True)
-        self.setMouseTracking(True)
-        self.set_color(self.default_color)
-
-    def set_color(self, color):
-        self.setStyleSheet(
-            f"""
-            QPushButton {{
-                background-color: {color.name()};
-                color: #D8DEE9;
-                font-size: 18px;
-                padding: 10px;
-                margin: 5px;
-                border: 1px solid #3B4252;
-                border-radius: 5px;
-            }}
-            QPushButton:pressed {{
-                background-color: {self.pressed_color.name()};
-            }}
-            """
-        )
-
-    def animate_color(self, start_color, end_color, duration):
-        self.animation = QVariantAnimation(self)
-        self.animation.setDuration(duration)
-        self.animation.setStartValue(start_color)
-        self.animation.setEndValue(end_color)
-        self.animation.valueChanged.connect(lambda value: self.set_color(value))
-        self.animation.start()
-
-    def enterEvent(self, event):
-        self.animate_color(self.default_color, self.hover_color, 50)
-        super().enterEvent(event)
-
-    def leaveEvent(self, event):
-        self.animate_color(self.hover_color, self.default_color, 50)
-        super().leaveEvent(event)
-
-    def mousePressEvent(self, event):
-        self.animate_color(self.hover_color, self.pressed_color, 100)
-        super().mousePressEvent(event)
-
     def mouseReleaseEvent(self, event):
         super().mouseReleaseEvent(event)
-        self.animate_color(self.pressed_color, self.hover_color, 100)
         self.clearFocus()
 
 
-class ExpressionElement:
-    def __init__(self, value, unit=None):
-        self.is_date = False
-        date_pattern = r'^\d{4}-\d{2}-\d{2}$'
-        datetime_pattern = r'^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}(:\d{2}(\.\d+)?)?((?:[+-]\d{2}:\d{2})|Z)?$'
-
-        if isinstance(value, datetime):
-            self.value = value
-            self.is_date = True
-        elif isinstance(value, str):
-            if re.match(datetime_pattern, value):
-                try:
-                    self.value = datetime.fromisoformat(value.replace("Z", "+00:00"))
-                    self.is_date = True
-                except ValueError:
-                    raise ValueError(f"Invalid ISO 8601 datetime format: {value}")
-            elif re.match(date_pattern, value):
-                try:
-                    self.value = datetime.strptime(value, "%Y-%m-%d")
-                    self.is_date = True
-                except ValueError:
-                    raise ValueError(f"Invalid date format: {value}")
-            else:
-                if '.' in value:
-                    self.value = float(value)
-                else:
-                    self.value = int(value)
-        else:
-            self.value = value
-        
-        self.unit = unit and unit.replace('µ', 'u')
-        self.obj = ureg.Quantity(self.value, self.unit) if not self.is_date else self.value
-
-    @staticmethod
-    def from_constant(name):
-        if name == 'now':
-            return ExpressionElement(datetime.now())
-        if name == 'today':
-            return ExpressionElement(datetime.combine(datetime.now(), datetime.min.time()))
-
-        if name == 'c':
-            obj = ureg.Quantity("speed_of_light")
-        else:
-            obj = ureg.Quantity(name)
-        return ExpressionElement(obj.magnitude, str(obj.units))
-
-    def set_unit(self, unit):
-        return ExpressionElement(self.value, unit)
-
-    def __repr__(self):
-        unitstr = " "+self.unit if self.unit else ''
-        return f"EE({self.value}{unitstr})"
-
-integer = Combine(Optional(oneOf('+ -')) + Word(nums)).setParseAction(lambda t: int(t[0]))
-float_number = Combine(
-    Optional(oneOf('+ -')) + ((Optional(Word(nums)) + '.' + Word(nums)) | (Word(nums) + '.'))
-).setParseAction(lambda t: float(t[0]))
-scientific_number = Combine(Optional(oneOf('+ -')) + Word(nums) + Optional('.') + Optional(Word(nums)) + oneOf("e E") + Optional(oneOf('+ -')) + Word(nums)).setParseAction(lambda t: float(t[0]))
-number = scientific_number | float_number | integer
-
-unit = Word(alphas)
-value_without_unit = number.setParseAction(lambda t: ExpressionElement(t[0], None))
-value_with_unit = Group(number + unit).setParseAction(lambda t: t[0][0].set_unit(t[0][1]))
-
-constant = Word(alphas + "_").setParseAction(lambda t: [ExpressionElement.from_constant(t[0])])
-
-date_pattern = Combine(Word(nums, exact=4) + '-' + Word(nums, exact=2) + '-' + Word(nums, exact=2)).setParseAction(lambda t: ExpressionElement(t[0], None))
-datetime_pattern = Combine(Word(nums, exact=4) + '-' + Word(nums, exact=2) + '-' + Word(nums, exact=2) + 'T' + Word(nums, exact=2) + ':' + Word(nums, exact=2) + Optional(':' + Word(nums, exact=2)) + Optional('.' + Word(nums)) + Optional(oneOf('+ -') + Word(nums, exact=2) + ':' + Word(nums, exact=2) | 'Z')).setParseAction(lambda t: ExpressionElement(t[0], None))
-operand = datetime_pattern | date_pattern | value_with_unit | value_without_unit | constant
-
-plus = oneOf('+ -')
-mult = oneOf('* /')
-exp = oneOf('^ **')
-
-expr = infixNotation(
-    operand,
-    [
-        (exp, 2, opAssoc.RIGHT),
-        (mult, 2, opAssoc.LEFT),
-        (plus, 2, opAssoc.LEFT),
-    ]
-)
-
-def parse_expression(expression):
-    return expr.parseString(expression, parseAll=True).asList()
-
-class Expression:
-    def __init__(self, expr):
-        self.parsed_expression = parse_expression(expr)[0]
-        self.parsed_expression = self.parsed_expression
-    
-    def evaluate(self):
-        result = self._evaluate_expression(self.parsed_expression)
-        if isinstance(result, ExpressionElement):
-            result = result.obj
-        if isinstance(result, datetime):
-            return result
-        return result.to_preferred(ureg.default_preferred_units) 
-    
-    def _evaluate_expression(self, expr):
-        if isinstance(expr, ExpressionElement):
-            return expr.obj
-        if isinstance(expr, pint.Quantity):
-            return expr
-        if isinstance(expr, list):
-            if len(expr) == 3:
-                left = self._evaluate_expression(expr[0])
-                op = expr[1]
-                right = self._evaluate_expression(expr[2])
-
-                if isinstance(left, datetime) or isinstance(right, datetime):
-                    if isinstance(left, pint.Quantity):
-                        left = timedelta(seconds=left.to('seconds').magnitude)
-                    if isinstance(right, pint.Quantity):
-                        right = timedelta(seconds=right.to('seconds').magnitude)
-                    
-                    if op == '+':
-                        return ExpressionElement(left + right, None)
-                    elif op == '-':
-                        return ExpressionElement(left - right, None)
-                    else:
-                        raise ValueError(f"Unsupported operation with datetime:\nL: {repr(left)}\nO: {repr(op)}\nR: {repr(right)}")
-
-                if op == '*':
-                    result = left * right
-                elif op == '+':
-                    result = left + right
-                elif op == '/':
-                    result = left / right
-                elif op == '-':
-                    result = left - right
-                elif op in ['^', '**']:
-                    assert right.dimensionless, "A power can only be dimensionless"
-                    result = np.power(left, right)
-                else:
-                    raise ValueError(f"Unsupported operation:\nL: {repr(left)}\nO: {repr(op)}\nR: {repr(right)}")
-                
-                return result
-            if len(expr) % 2 == 1:
-                tmp = self._evaluate_expression([expr[0], expr[1], expr[2]])
-                for i in range(3, len(expr), 2):
-                    tmp = self._evaluate_expression([tmp, expr[i], expr[i+1]])
-                return tmp
-            elif len(expr) == 2:
-                value = self._evaluate_expression(expr[0])
-                unit = expr[1]
-                return ureg.Quantity(value, unit)
-            else:
-                raise ValueError(f"Unsupported expression:\n{repr(expr)}")
-        elif isinstance(expr, ExpressionElement):
-            return expr.obj
-        else:
-            if isinstance(expr, datetime):
-                return ExpressionElement(expr, None)
-            value = float(expr)
-            return ureg.Quantity(value)
-
-class UnacalcIcon:
-    def __init__(self):
-        buttons_texts = random.sample('+−×÷', 4)
-        buttons_coords = namedtuple('ButtonCoords', 'left top right bottom')(28, 45, 72, 89)
-        icon_data = bytes(f"""<svg width="100" height="100" viewBox="0 0 100 100" xmlns="http://www.w3.org/2000/svg">
+# Four buttons showing the operators in a random order, filled in with str.format
+ICON_SVG = """<svg width="100" height="100" viewBox="0 0 100 100" xmlns="http://www.w3.org/2000/svg">
   <rect width="100" height="100" rx="15" ry="15" fill="#333" />
   <rect x="8" y="8" width="40" height="40" rx="5" ry="5" fill="#FF0000" />
-  <text x="{buttons_coords.left}" y="{buttons_coords.top}" font-size="55" font-weight="bold" fill="white" text-anchor="middle" alignment-baseline="middle">{buttons_texts[0]}</text>
+  <text x="28" y="45" font-size="55" font-weight="bold" fill="white" text-anchor="middle" alignment-baseline="middle">{0}</text>
   <rect x="52" y="8" width="40" height="40" rx="5" ry="5" fill="#00FF00" />
-  <text x="{buttons_coords.right}" y="{buttons_coords.top}" font-size="55" font-weight="bold" fill="black" text-anchor="middle" alignment-baseline="middle">{buttons_texts[1]}</text>
+  <text x="72" y="45" font-size="55" font-weight="bold" fill="black" text-anchor="middle" alignment-baseline="middle">{1}</text>
   <rect x="8" y="52" width="40" height="40" rx="5" ry="5" fill="#1E90FF" />
-  <text x="{buttons_coords.left}" y="{buttons_coords.bottom}" font-size="55" font-weight="bold" fill="white" text-anchor="middle" alignment-baseline="middle">{buttons_texts[2]}</text>
+  <text x="28" y="89" font-size="55" font-weight="bold" fill="white" text-anchor="middle" alignment-baseline="middle">{2}</text>
   <rect x="52" y="52" width="40" height="40" rx="5" ry="5" fill="#FFFF00" />
-  <text x="{buttons_coords.right}" y="{buttons_coords.bottom}" font-size="55" font-weight="bold" fill="black" text-anchor="middle" alignment-baseline="middle">{buttons_texts[3]}</text>
+  <text x="72" y="89" font-size="55" font-weight="bold" fill="black" text-anchor="middle" alignment-baseline="middle">{3}</text>
   <filter id="shadow" x="-20%" y="-20%" width="140%" height="140%">
     <feDropShadow dx="3" dy="3" stdDeviation="3" flood-color="rgba(0,0,0,0.5)" />
   </filter>
@@ -253,7 +40,12 @@ class UnacalcIcon:
   <rect x="8" y="52" width="40" height="40" rx="5" ry="5" fill="none" filter="url(#shadow)" />
   <rect x="52" y="52" width="40" height="40" rx="5" ry="5" fill="none" filter="url(#shadow)" />
 </svg>
-""", "utf8")
+"""
+
+
+class UnacalcIcon:
+    def __init__(self):
+        icon_data = ICON_SVG.format(*random.sample('+−×÷', 4)).encode("utf8")
         self.pixmap = QPixmap()
         self.pixmap.loadFromData(icon_data)
         self.icon = QIcon(self.pixmap)
@@ -266,14 +58,24 @@ class Unacalc(QWidget):
         self.setWindowTitle(f'Unacalc {VERSION}')
         self.setGeometry(100, 100, 500, 500)
         
-        self.setWindowIcon(UnacalcIcon().icon)
+        # Rendered once; later windows share the first one's icon
+        if Unacalc._ICON is None:
+            Unacalc._ICON = UnacalcIcon().icon
+        self.setWindowIcon(Unacalc._ICON)
+
+        # Fonts need a running QApplication, so they are created with the first window
+        if Unacalc._LABEL_FONT is None:
+            Unacalc._LABEL_FONT = QFont('Arial', 12, QFont.Bold)
+            Unacalc._CONTROL_FONT = QFont('Arial', 12)
+            Unacalc._INPUT_FONT = QFont()
+            Unacalc._INPUT_FONT.setPointSize(14)
 
         self.layout = QVBoxLayout()
 
         self.create_menu()
 
         self.input_field_label = QLabel("Input Expression:")
-        self.input_field_label.setFont(QFont('Arial', 12, QFont.Bold))
+        self.input_field_label.setFont(self._LABEL_FONT)
         self.input_field_label.setObjectName("inputLabel")
         self.layout.addWidget(self.input_field_label)
         
@@ -283,7 +85,7 @@ class Unacalc(QWidget):
         self.layout.addSpacing(10)
         
         self.result_field_label = QLabel("Result:")
-        self.result_field_label.setFont(QFont('Arial', 12, QFont.Bold))
+        self.result_field_label.setFont(self._LABEL_FONT)
         self.result_field_label.setObjectName("resultLabel")
         self.layout.addWidget(self.result_field_label)
 
@@ -301,7 +103,7 @@ class Unacalc(QWidget):
         controls_layout = QHBoxLayout()
 
         self.precision_label = QLabel("Precision:")
-        self.precision_label.setFont(QFont('Arial', 12))
+        self.precision_label.setFont(self._CONTROL_FONT)
         self.precision_label.setObjectName("precisionLabel")
         controls_layout.addWidget(self.precision_label)
 
@@ -330,7 +132,7 @@ class Unacalc(QWidget):
         controls_layout.addWidget(self.precision_slider)
 
         self.format_label = QLabel("Display Format:")
-        self.format_label.setFont(QFont('Arial', 12))
+        self.format_label.setFont(self._CONTROL_FONT)
         self.format_label.setObjectName("formatLabel")
         controls_layout.addWidget(self.format_label)
 
@@ -346,21 +148,34 @@ class Unacalc(QWidget):
 
         self.layout.addLayout(controls_layout)
 
-        font = QFont()
-        font.setPointSize(14)
-
-        self.input_field.setFont(font)
-        self.result_value_field.setFont(font)
-        self.result_unit_field.setFont(font)
+        self.input_field.setFont(self._INPUT_FONT)
+        self.result_value_field.setFont(self._INPUT_FONT)
+        self.result_unit_field.setFont(self._INPUT_FONT)
 
         self.layout.addSpacing(10)
         
         self.create_buttons()
+        self._focus_widgets = frozenset([self.input_field, self.result_value_field, self.result_unit_field, *self.buttons.values()])
         
         self.setLayout(self.layout)
 
+        self._debounce = QTimer(self)
+        self._debounce.setSingleShot(True)
+        self._debounce.setInterval(self.DEBOUNCE_MS)
+        self._debounce.timeout.connect(self._do_calculate)
+        self._last_input = None
+        self._results = {}
+        self._last_display = None
+        self._last_result = None
+        self._err_state = None
+        self._last_value_text = ""
+        self._last_unit_text = ""
+        self._prev_text = None
+        self._prev_expression = None
+        self.update_display_format()
+
         self.input_field.textChanged.connect(self.auto_calculate)
-        self.input_field.returnPressed.connect(self.auto_calculate)
+        self.input_field.returnPressed.connect(lambda: self._do_calculate(force=True))
 
         exit_shortcut = QAction(self)
         exit_shortcut.setShortcut(QKeySequence("Ctrl+W"))
@@ -369,6 +184,8 @@ class Unacalc(QWidget):
 
         QTimer.singleShot(0, self.center_window)
         self.show()
+        # Pays pint's first-use cost while idle rather than on the first keystroke
+        QTimer.singleShot(0, warm_up)
 
         self.setStyleSheet("""
             QWidget {
@@ -401,6 +218,10 @@ class Unacalc(QWidget):
             QPushButton:pressed {
                 background-color: #5E81AC;
             }
+            #buttonGrid QPushButton {
+                margin: 5px;
+                border-radius: 5px;
+            }
             QLabel#inputLabel, QLabel#resultLabel, QLabel#precisionLabel, QLabel#formatLabel {
                 font-size: 16px;
                 font-weight: bold;
@@ -507,9 +328,20 @@ class Unacalc(QWidget):
         '–': '-',
     }
     REV_SPECIAL_BUTTONS = {v: k for k, v in SPECIAL_BUTTONS.items()}
+    RESULTS_CACHE_SIZE = 256
+    DEBOUNCE_MS = 80
+    _ICON = None
+    _LABEL_FONT = None
+    _CONTROL_FONT = None
+    _INPUT_FONT = None
 
     def create_buttons(self):
         self.buttons = {}
+        # Buttons are styled once through the window stylesheet's #buttonGrid rules
+        buttons_widget = QWidget()
+        buttons_widget.setObjectName("buttonGrid")
+        buttons_widget_layout = QVBoxLayout(buttons_widget)
+        buttons_widget_layout.setContentsMargins(0, 0, 0, 0)
         button_layouts = [
             (QHBoxLayout(), ['(', ')', '⌫', 'Clear']),
             (QGridLayout(), [
@@ -530,61 +362,119 @@ class Unacalc(QWidget):
                     text = button_def
                     button = CustomButton(text)
                     layout.addWidget(button)
-                button.clicked.connect(self.on_button_clicked)
+                if text == '⌫':
+                    button.clicked.connect(self.input_field.backspace)
+                elif text == 'Clear':
+                    button.clicked.connect(self.input_field.clear)
+                else:
+                    button.clicked.connect(partial(self._insert, self.SPECIAL_BUTTONS.get(text, text)))
                 self.buttons[text] = button
                 if text in self.SPECIAL_BUTTONS:
                     self.buttons[self.SPECIAL_BUTTONS[text]] = button
 
-            self.layout.addLayout(layout)
+            buttons_widget_layout.addLayout(layout)
 
-    def on_button_clicked(self):
-        button = self.sender()
-        text = button.text()
-        if text == '⌫':
-            self.input_field.setText(self.input_field.text()[:-1])
-        elif text == 'Clear':
-            self.input_field.clear()
-        else:
-            if text in self.SPECIAL_BUTTONS:
-                text = self.SPECIAL_BUTTONS[text]
-            self.input_field.setText(self.input_field.text() + text)
+        self.layout.addWidget(buttons_widget)
+
+    def _insert(self, text):
+        self.input_field.insert(text)
 
     def auto_calculate(self):
+        # Coalesce bursts of keystrokes into a single evaluation
+        self._debounce.start()
+
+    def _do_calculate(self, force=False):
+        self._debounce.stop()
         expr = self.input_field.text()
-        expr = expr.replace('µ', 'u')
+        if expr == self._last_input and not force:
+            return
+        self._last_input = expr
+        expr = expr.translate(NORMALIZE)
+        if self.is_incomplete(expr):
+            self._last_display = None
+            self._last_result = None
+            self._set_result_text("", "")
+            self._set_error_state(False)
+            return
         try:
-            dest_unit = None
-            if ' in ' in expr:
-                [expr, dest_unit] = expr.split(' in ')
-            result = Expression(expr).evaluate()
-            if dest_unit:
-                result = ureg.Quantity(result.m_as(dest_unit), dest_unit)
+            head, sep, tail = expr.rpartition(' in ')
+            if sep:
+                expr, dest_unit = head, tail
+            else:
+                dest_unit = None
+            result = self._results.get((expr, dest_unit))
+            if result is None:
+                # While typing "1 + 2" then "1 + 2 + 3", only the new term is parsed and evaluated
+                expression = None
+                if self._prev_expression is not None and expr.startswith(self._prev_text):
+                    expression = self._prev_expression.extended(expr[len(self._prev_text):])
+                if expression is None:
+                    expression = cached_expression(expr)
+                self._prev_text, self._prev_expression = expr, expression
+                result = expression.evaluate()
+                if dest_unit:
+                    result = result.to(parse_unit(dest_unit))
+                else:
+                    result = to_preferred(result)
+                # Results involving now/today must be recomputed every time
+                if expression.is_constant:
+                    if len(self._results) >= self.RESULTS_CACHE_SIZE:
+                        self._results.clear()
+                    self._results[(expr, dest_unit)] = result
             self.display_result(result)
-            self.input_field.setStyleSheet("background-color: None;")
+            self._set_error_state(False)
         except Exception as e:
-            self.result_value_field.setText("Error")
-            self.result_unit_field.setText("")
-            self.input_field.setStyleSheet("background-color: #550000;")
+            self._last_display = None
+            self._last_result = None
+            self._set_result_text("Error", "")
+            self._set_error_state(True)
             print(f"Error: {e}", file=sys.stderr)
             # traceback.print_exc()
 
+    def _set_error_state(self, error):
+        # Applying a stylesheet re-polishes the field, so it is only done when the state flips
+        if error != self._err_state:
+            self._err_state = error
+            self.input_field.setStyleSheet(INPUT_ERROR_STYLE if error else INPUT_STYLE)
+
+    # Ends in an operator, an opening parenthesis or an exponent still being typed ("1e")
+    _INCOMPLETE_RE = re.compile(r'(?:[-+*/^(]|\d[eE])\s*$')
+
+    def is_incomplete(self, expr):
+        return (not expr.strip()
+                or expr.count('(') != expr.count(')')
+                or self._INCOMPLETE_RE.search(expr) is not None)
+
     def display_result(self, result):
-        precision = self.precision_slider.value()
+        self._last_result = result
         if isinstance(result, datetime):
-            self.result_value_field.setText(result.strftime('%Y-%m-%d %H:%M:%S'))
-            self.result_unit_field.setText("")
+            key = (result, None)
         else:
-            if self.scientific_radio.isChecked():
-                self.result_value_field.setText(f"{result.magnitude:.{precision}e}")
-            else:
-                self.result_value_field.setText(f"{result.magnitude:.{precision}f}")
-            self.result_unit_field.setText(str(result.units))
+            key = (result.magnitude, result.units, self._fmt)
+        if key == self._last_display:
+            return
+        self._last_display = key
 
+        if isinstance(result, datetime):
+            self._set_result_text(result.strftime('%Y-%m-%d %H:%M:%S'), "")
+        else:
+            self._set_result_text(format(result.magnitude, self._fmt), str(result.units))
+
+    def _set_result_text(self, value_text, unit_text):
+        # Results that differ beyond the shown precision often format identically
+        if value_text != self._last_value_text:
+            self._last_value_text = value_text
+            self.result_value_field.setText(value_text)
+        if unit_text != self._last_unit_text:
+            self._last_unit_text = unit_text
+            self.result_unit_field.setText(unit_text)
 
     def update_display_format(self):
-        expr = self.input_field.text()
-        if expr:
-            self.auto_calculate()
+        notation = 'e' if self.scientific_radio.isChecked() else 'f'
+        self._fmt = f".{self.precision_slider.value()}{notation}"
+        # Only the formatting changed, so the shown result is re-rendered rather than recomputed
+        if self._last_result is not None:
+            self.display_result(self._last_result)
 
     def keyPressEvent(self, event):
         key = event.text()
@@ -592,19 +482,20 @@ class Unacalc(QWidget):
             return
         elif key in self.buttons:
             button = self.buttons[key]
-            button.animate_color(button.default_color, button.pressed_color, 100)
-            button.animate_color(button.pressed_color, button.default_color, 100)
             button.click()
+            # Briefly show the pressed state; no animation objects are created
+            button.setDown(True)
+            QTimer.singleShot(80, lambda: button.setDown(False))
         elif event.key() == Qt.Key_Return or event.key() == Qt.Key_Enter:
-            self.auto_calculate()
+            self._do_calculate(force=True)
         elif event.key() == Qt.Key_Backspace:
             self.buttons['⌫'].click()
         elif key in '0123456789+-*/.()^' or key.isalpha():
-            self.input_field.setText(self.input_field.text() + key)
+            self.input_field.insert(key)
 
     def mousePressEvent(self, event):
         widget = self.childAt(event.pos())
-        if widget not in [self.input_field, self.result_value_field, self.result_unit_field] + list(self.buttons.values()):
+        if widget not in self._focus_widgets:
             self.input_field.clearFocus()
             self.result_value_field.clearFocus()
             self.result_unit_field.clearFocus()